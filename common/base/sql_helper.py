@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
+from string import Template
 from typing import Any, Iterable
 
 import pandas as pd
@@ -6,6 +8,40 @@ import pandas as pd
 import logging
 logger = logging.getLogger(__name__)
 
+# Statements generated by SQLhelper.generate_merge_query, placeholders are filled with pre-joined clauses
+_INSERT_NEW_ROWS_TEMPLATE = Template(
+    "INSERT INTO $destination ("
+    "\n    $insert_columns"
+    "\n)"
+    "\nSELECT"
+    "\n    $insert_values"
+    "\nFROM $source s"
+    "\nWHERE NOT EXISTS ("
+    "\n    SELECT 1"
+    "\n    FROM $destination t"
+    "\n    WHERE $match"
+    "\n)"
+)
+_MERGE_TEMPLATE = Template(
+    "MERGE $destination t"
+    "\nUSING $source s"
+    "\n    ON $match$update_statement$insert_statement"
+)
+_MERGE_UPDATE_TEMPLATE = Template(
+    "\nWHEN MATCHED THEN"
+    "\n    UPDATE SET"
+    "\n        $update"
+)
+_MERGE_INSERT_TEMPLATE = Template(
+    "\nWHEN NOT MATCHED THEN"
+    "\n    INSERT("
+    "\n        $insert_columns"
+    "\n    )"
+    "\n   VALUES("
+    "\n        $insert_values"
+    "\n    )"
+)
+
 
 class SQLhelper(ABC):
     """
@@ -115,65 +151,88 @@ class SQLhelper(ABC):
         key_columns: str|Iterable,
         insert_columns: str|Iterable = (),
         update_columns: str|Iterable = (),
+        extra_match_conditions: str|Iterable = (),
+        source_clause: str = None,
     ):
+        """
+        Generates a MERGE statement matching rows of the source and the destination tables by key columns.
 
-        if not insert_columns and not update_columns:
-            raise ValueError(
-                "At least one of ('insert_columns', 'update_columns') is expected to be not empty."
-            )
+        extra_match_conditions are added to the key match with AND. The destination table is aliased as `t`,
+        the source as `s`. Subclasses use it for engine-specific filters, e.g. to limit destination rows
+        to the range of source keys, which lets the engine prune data clustered or partitioned by the key.
 
-        #put all _columns parameters in lists
-        if type(key_columns) is str: 
-            key_columns=[key_columns]
-        else: 
-            key_columns=list(key_columns)
+        If there are no columns to update, an append-only `INSERT ... SELECT ... WHERE NOT EXISTS` statement
+        is generated instead of MERGE: new rows are inserted, existing rows of the destination are not rewritten.
 
-        if type(insert_columns) is str: 
-            insert_columns=[insert_columns]
-        else:
-            insert_columns=list(insert_columns)
+        source_clause, if set, is read instead of the source table, e.g. a subquery over it in parentheses.
+        """
 
-        if type(update_columns) is str: 
-            update_columns=[update_columns]
-        else:
-            update_columns=[col for col in update_columns if col not in key_columns]
+        #put all _columns parameters in tuples, input iterables are not modified
+        key_columns = (key_columns,) if isinstance(key_columns, str) else tuple(key_columns)
+        insert_columns = (insert_columns,) if isinstance(insert_columns, str) else tuple(insert_columns)
+        update_columns = (update_columns,) if isinstance(update_columns, str) else update_columns
+        key_columns_set = frozenset(key_columns)
+        update_columns = tuple(col for col in update_columns if col not in key_columns_set)
+        extra_match_conditions = (
+            (extra_match_conditions,) if isinstance(extra_match_conditions, str) else tuple(extra_match_conditions)
+        )
 
-        match_clause = "\n    AND ".join(
-                [f"t.{col} = s.{col}" for col in key_columns]
+        return SQLhelper._build_merge_query(
+            destination_table_full_name,
+            source_table_full_name,
+            key_columns,
+            insert_columns,
+            update_columns,
+            extra_match_conditions,
+            source_clause or source_table_full_name,
         )
 
-        if update_columns:
-            update_clause = ",\n        ".join(
-                    [f"t.{col} = s.{col}" for col in update_columns]
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _build_merge_query(
+        destination_table_full_name: str,
+        source_table_full_name: str,
+        key_columns: tuple,
+        insert_columns: tuple,
+        update_columns: tuple,
+        extra_match_conditions: tuple,
+        source_clause: str,
+    ) -> str:
+        # arguments are normalized by generate_merge_query, the statement is built once per unique combination
+        if not insert_columns and not update_columns:
+            raise ValueError(
+                "At least one of ('insert_columns', 'update_columns') is expected to be not empty (key columns are not updated)."
             )
 
-            update_statement = (
-                "\nWHEN MATCHED THEN"
-                "\n    UPDATE SET"
-                f"\n        {update_clause}"
-            )
-        else:
-            update_statement=""
-
-        if len(insert_columns)>0:
-            insert_columns_clause = ",\n        ".join(insert_columns)
-            insert_values_clause = ",\n        ".join([f"s.{col}" for col in insert_columns])
-            insert_statement = (
-                "\nWHEN NOT MATCHED THEN"
-                "\n    INSERT("
-                f"\n        {insert_columns_clause}"
-                "\n    )"
-                "\n   VALUES("
-                f"\n        {insert_values_clause}"
-                "\n    )"
+        match_clause = "\n    AND ".join(
+            (*(f"t.{col} = s.{col}" for col in key_columns), *extra_match_conditions)
+        )
+
+        if not update_columns:
+            return _INSERT_NEW_ROWS_TEMPLATE.substitute(
+                destination=destination_table_full_name,
+                source=source_clause,
+                insert_columns=",\n    ".join(insert_columns),
+                insert_values=",\n    ".join(f"s.{col}" for col in insert_columns),
+                match=match_clause,
             )
-        else: 
-            insert_statement=""
-        
-        query = (
-            f"MERGE {destination_table_full_name} t"
-            f"\nUSING {source_table_full_name} s"
-            f"\n    ON {match_clause}{update_statement}{insert_statement}"
+
+        update_statement = _MERGE_UPDATE_TEMPLATE.substitute(
+            update=",\n        ".join(f"t.{col} = s.{col}" for col in update_columns)
         )
 
-        return query
\ No newline at end of file
+        if insert_columns:
+            insert_statement = _MERGE_INSERT_TEMPLATE.substitute(
+                insert_columns=",\n        ".join(insert_columns),
+                insert_values=",\n        ".join(f"s.{col}" for col in insert_columns),
+            )
+        else:
+            insert_statement = ""
+
+        return _MERGE_TEMPLATE.substitute(
+            destination=destination_table_full_name,
+            source=source_clause,
+            match=match_clause,
+            update_statement=update_statement,
+            insert_statement=insert_statement,
+        )
\ No newline at end of file
@@ -1,14 +1,37 @@
-from typing import Any, Iterable
+from functools import lru_cache
+import hashlib
+import os
+import tempfile
+from typing import Any, Iterable, Iterator
 
 from google.api_core.exceptions import NotFound
+from google.auth.credentials import Credentials
 from google.cloud import bigquery
 import pandas as pd
+import pyarrow as pa
+
+try:
+    from google.cloud import bigquery_storage
+except ImportError:
+    bigquery_storage = None
 
 from .base.sql_helper import SQLhelper
 
 import logging
 logger = logging.getLogger(__name__)
 
+# legacy type names returned in result schemas -> standard SQL names expected by query parameters
+_STANDARD_SQL_TYPES = {"INTEGER": "INT64", "FLOAT": "FLOAT64", "BOOLEAN": "BOOL"}
+
+@lru_cache(maxsize=None)
+def get_bq_client(location: str = None) -> bigquery.Client:
+    """
+    Returns a BigQuery client shared by the process for the given default location:
+    credentials are discovered and the HTTP connection pool is created only once.
+    """
+    return bigquery.Client(location=location)
+
+
 class BQHelper(SQLhelper):
     """
     BigQuery implementation of SQLhelper interface.
@@ -20,10 +43,34 @@ class BQHelper(SQLhelper):
             project: str, 
             default_dataset: str = None, 
             client: bigquery.Client = None,
+            credentials: Credentials = None,
         ):
         self.project = project
         self.default_dataset = default_dataset
-        self.client = client or bigquery.Client()
+        # credentials are kept for the Storage Read API client, None means application default credentials
+        self.credentials = credentials
+        if client is None:
+            client = get_bq_client() if credentials is None else bigquery.Client(credentials=credentials)
+        self.client = client
+        self._bqstorage_client = None
+        self._schema_cache = {}  # full table name -> schema, see df_to_table
+
+    @property
+    def bqstorage_client(self):
+        """
+        BigQuery Storage Read API client, created on first use and reused for all reads.
+        Results are downloaded as parallel Arrow streams instead of paged JSON rows.
+        It uses the credentials passed to the helper, application default credentials if none were passed.
+        None if google-cloud-bigquery-storage is not installed: reads fall back to the REST API.
+        """
+        if self._bqstorage_client is None and bigquery_storage is not None:
+            self._bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=self.credentials)
+        return self._bqstorage_client
+
+    def _to_dataframe_kwargs(self) -> dict:
+        # without the Storage Read API package the REST API is used, the library is not asked to create a client
+        bqstorage_client = self.bqstorage_client
+        return {"bqstorage_client": bqstorage_client, "create_bqstorage_client": bqstorage_client is not None}
 
     def full_table_name(self, table: str) -> str:
         """
@@ -40,13 +87,35 @@ class BQHelper(SQLhelper):
             return f"{self.project}.{table}"
         return f"{self.project}.{self.default_dataset}.{table}"
 
-    def table_to_df(self, table: str, condition: str = "") -> pd.DataFrame:
+    def query_to_df(self, query: str, arrow_strings: bool = False) -> pd.DataFrame:
+        """
+        Run a query and read its result to a pandas DataFrame through the BigQuery Storage Read API (if available).
+
+        Args:
+            query (str): SQL query.
+            arrow_strings (bool): If True, STRING columns get the pyarrow-backed "string[pyarrow]" dtype instead of object.
+                It keeps strings in contiguous Arrow buffers (less memory) and runs .str methods as Arrow compute kernels.
+                Nulls are pd.NA.
+
+        Returns:
+            pd.DataFrame: Query result.
+        """
+        return self.client.query(query).to_dataframe(
+            **self._to_dataframe_kwargs(),
+            string_dtype=pd.StringDtype("pyarrow") if arrow_strings else None,
+        )
+
+    def table_to_df(self, table: str, condition: str = "", cache_dir: str = None) -> pd.DataFrame:
         """
         Read a table from BigQuery to a pandas DataFrame.
+        Without a condition, the table is read directly (no query job is run and billed), else a SELECT query is run.
 
         Args:
             table (str): Table name (optionally prefixed with dataset).
             condition (str): Optional WHERE condition (without 'WHERE').
+            cache_dir (str): Optional local directory to cache results in as Parquet files.
+                A repeated read with the same table and condition is served from the cache without querying BigQuery.
+                Cached data is not refreshed, delete the file to read the table again.
 
         Returns:
             pd.DataFrame: Resulting data.
@@ -55,7 +124,66 @@ class BQHelper(SQLhelper):
         query = f"SELECT * FROM `{table_full}`"
         if condition:
             query += f" WHERE {condition}"
-        return self.client.query(query).to_dataframe()
+
+        if cache_dir is None:
+            return self._table_to_df(table_full, query, condition)
+
+        query_hash = hashlib.md5(query.encode("UTF-8"), usedforsecurity=False).hexdigest()
+        cache_path = os.path.join(cache_dir, f"{table_full}_{query_hash}.parquet")
+        if os.path.exists(cache_path):
+            logger.info(f"Reading {table_full} from cache {cache_path}")
+            return pd.read_parquet(cache_path)
+
+        df = self._table_to_df(table_full, query, condition)
+        os.makedirs(cache_dir, exist_ok=True)
+        # written to a unique temporary file and renamed, so a concurrent reader or writer
+        # never sees a partially written cache file
+        with tempfile.NamedTemporaryFile(
+            dir=cache_dir, prefix=os.path.basename(cache_path), suffix=".tmp", delete=False
+        ) as f:
+            tmp_path = f.name
+        try:
+            df.to_parquet(tmp_path, compression="zstd")
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        logger.info(f"Cached {table_full} to {cache_path}")
+        return df
+
+    def _table_to_df(self, table_full: str, query: str, condition: str) -> pd.DataFrame:
+        if condition:
+            return self.query_to_df(query)
+        return self.client.list_rows(table_full).to_dataframe(**self._to_dataframe_kwargs())
+
+    def table_to_arrow_batches(
+        self,
+        table: str,
+        condition: str = "",
+        max_stream_count: int = None,
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Read a table from BigQuery as a stream of Arrow record batches.
+        Unlike table_to_df, memory use is proportional to a batch, not to the whole table.
+
+        Args:
+            table (str): Table name (optionally prefixed with dataset).
+            condition (str): Optional WHERE condition (without 'WHERE').
+            max_stream_count (int): Maximum number of parallel download streams of the Storage Read API.
+                None lets the API decide. Order of rows is preserved only with 1 stream.
+
+        Yields:
+            pa.RecordBatch: Batches of rows.
+        """
+        table_full = self.full_table_name(table)
+        if condition:
+            rows = self.client.query(f"SELECT * FROM `{table_full}` WHERE {condition}").result()
+        else:
+            rows = self.client.list_rows(table_full)
+        yield from rows.to_arrow_iterable(
+            bqstorage_client=self.bqstorage_client,
+            max_stream_count=max_stream_count,
+        )
 
     def df_to_table(
             self, 
@@ -63,10 +191,14 @@ class BQHelper(SQLhelper):
             table: str, 
             truncate: bool = False, 
             strict_schema: bool = False,
-            schema: bigquery.SchemaField | None = None
+            schema: bigquery.SchemaField | None = None,
+            parquet_compression: str = "zstd",
+            refresh_schema: bool = False,
     ) -> bigquery.QueryJob:
         """
         Write a pandas DataFrame to a BigQuery table.
+        Data is always written with a single batch load job (free, no streaming buffer), not with streaming inserts (insert_rows*),
+        so rows are available to TRUNCATE, DELETE and MERGE statements right after the job is done.
 
         Args:
             df (pd.DataFrame): DataFrame to write.
@@ -74,17 +206,23 @@ class BQHelper(SQLhelper):
             truncate (bool): If True, table will be deleted before loading.
             strict_schema (bool): If True, passes schema to job config.
             schema (Optional[bigquery.SchemaField]): Schema for the table. If None and strict_schema is True, it will be inferred from the table (if exists).
+                An inferred schema is cached by the helper and reused for the next loads to the same table.
+            parquet_compression (str): Compression of the Parquet file the DataFrame is uploaded as ("zstd", "snappy", "gzip", "none").
+            refresh_schema (bool): If True, the schema is inferred from the table again instead of using the cached one.
 
         Returns:
             BigQuery job.
         """
         table_full = self.full_table_name(table)
         if strict_schema:
+            if schema is None and not refresh_schema:
+                schema = self._schema_cache.get(table_full)
             if schema is None:
                 # If schema is not provided, try to infer it from the existing table
                 try:
                     table_ref = self.client.get_table(table_full)
                     schema = table_ref.schema
+                    self._schema_cache[table_full] = schema
                     logger.info(f"Inferred schema for {table_full}: \n" + (",\n".join([f"{f.name}: {f.field_type}" for f in schema])))
                 except Exception as e:
                     logger.error(f"Failed to get schema for {table_full}: {e}")
@@ -92,6 +230,7 @@ class BQHelper(SQLhelper):
             # Create job config with schema
             job_config = bigquery.LoadJobConfig(
                 write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+                source_format=bigquery.SourceFormat.PARQUET,
                 schema=schema
             )
         else:
@@ -102,6 +241,7 @@ class BQHelper(SQLhelper):
             # Create job config without schema
             job_config = bigquery.LoadJobConfig(
                 write_disposition= bigquery.WriteDisposition.WRITE_APPEND,
+                source_format=bigquery.SourceFormat.PARQUET,
             )
         if truncate:
             try:
@@ -112,8 +252,8 @@ class BQHelper(SQLhelper):
                 logger.warning(f"{table_full} does not exist, skipping truncate.")
 
         job = self.client.load_table_from_dataframe(
-            df, table_full, job_config
-        ) 
+            df, table_full, job_config=job_config, parquet_compression=parquet_compression
+        )
         job.result()
         logger.info(f"Loaded {len(df)} rows to {table_full}")
         return job
@@ -135,33 +275,125 @@ class BQHelper(SQLhelper):
         Returns:
             bool: True if duplicates exist, else False.
         """
-        table_full = self.full_table_name(table)
-        group_by_clause = ", ".join(key_columns)
+        return self.check_tables_duplicates([table], key_columns, raise_error)[table]
 
-        query = f"""
-            SELECT COUNT(1) AS duplicate_count
-            FROM (
-                SELECT 1
-                FROM {table_full}
-                GROUP BY {group_by_clause}
-                HAVING COUNT(1) > 1
-            )
+    def check_tables_duplicates(
+        self,
+        tables: Iterable[str],
+        key_columns: Iterable,
+        raise_error: bool = False
+    ) -> dict[str, bool]:
         """
+        Checks for duplicates in several BigQuery tables based on the same key columns with a single query.
 
-        job = self.client.query(query)
-        result  = job.result()
-        row = list(result)[0]
-        duplicate_count = row["duplicate_count"]
+        Args:
+            tables (Iterable[str]): Table names (optionally prefixed with dataset).
+            key_columns (Iterable): Unique key columns.
+            raise_error (bool): If True, raise error on duplicates (for the first table with duplicates in tables order).
 
-        if duplicate_count > 0:
-            message = f"Found {duplicate_count} duplicated values in {table_full} based on key: {key_columns}"
-            if raise_error:
-                raise ValueError(message)
-            else:
-                logger.warning(message)
-            return True
+        Returns:
+            dict[str, bool]: For each table, True if duplicates exist, else False.
+        """
+        has_duplicates, _ = self._check_duplicates_and_key_range(tables, key_columns, raise_error)
+        return has_duplicates
 
-        return False
+    def _check_duplicates_and_key_range(
+        self,
+        tables: Iterable[str],
+        key_columns: Iterable,
+        raise_error: bool = False,
+        key_range_table: str = None,
+    ) -> tuple[dict[str, bool], list[bigquery.ScalarQueryParameter]]:
+        """
+        Checks for duplicates in tables and, if key_range_table is set, reads the range of its key columns, all in one query.
+        The range is returned as query parameters `<key>_min` and `<key>_max`
+        used by _key_range_conditions, empty list if key_range_table is None.
+        """
+        tables = list(tables)
+        key_columns = list(key_columns)
+        query = self._duplicates_query(
+            tuple(self.full_table_name(table) for table in tables),
+            tuple(key_columns),
+            None if key_range_table is None else self.full_table_name(key_range_table),
+        )
+
+        job = self.client.query(query)
+        result = job.result()
+        row = next(iter(result))
+
+        has_duplicates = {}
+        for i, table in enumerate(tables):
+            duplicate_count = row[f"duplicate_count_{i}"]
+            has_duplicates[table] = duplicate_count > 0
+            if duplicate_count > 0:
+                message = f"Found {duplicate_count} duplicated values in {self.full_table_name(table)} based on key: {key_columns}"
+                if raise_error:
+                    raise ValueError(message)
+                else:
+                    logger.warning(message)
+
+        key_range_parameters = []
+        if key_range_table is not None:
+            key_range_field = next(field for field in result.schema if field.name == "key_range")
+            key_range_parameters = [
+                bigquery.ScalarQueryParameter(
+                    field.name,
+                    _STANDARD_SQL_TYPES.get(field.field_type, field.field_type),
+                    row["key_range"][field.name],
+                )
+                for field in key_range_field.fields
+            ]
+
+        return has_duplicates, key_range_parameters
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _duplicates_query(
+        tables_full_names: tuple,
+        key_columns: tuple,
+        key_range_table_full_name: str = None,
+    ) -> str:
+        # Built once per unique combination of tables and keys, see _check_duplicates_and_key_range
+        group_by_clause = ", ".join(key_columns)
+
+        select_clauses = [
+            f"""(
+                SELECT COUNT(1)
+                FROM (
+                    SELECT 1
+                    FROM {table_full}
+                    GROUP BY {group_by_clause}
+                    HAVING COUNT(1) > 1
+                )
+            ) AS duplicate_count_{i}"""
+            for i, table_full in enumerate(tables_full_names)
+        ]
+        if key_range_table_full_name is not None:
+            bounds_clause = ", ".join(
+                f"MIN({col}) AS {col}_min, MAX({col}) AS {col}_max" for col in key_columns
+            )
+            select_clauses.append(
+                f"(SELECT AS STRUCT {bounds_clause} FROM `{key_range_table_full_name}`) AS key_range"
+            )
+        return "SELECT\n            " + ",\n            ".join(select_clauses)
+
+    @staticmethod
+    def _key_range_conditions(key_columns: Iterable) -> tuple:
+        # destination rows limited to the range of source keys, values of the named parameters
+        # are read by _check_duplicates_and_key_range and passed with the query
+        return tuple(f"t.{col} BETWEEN @{col}_min AND @{col}_max" for col in key_columns)
+
+    @staticmethod
+    def _deduplicated_source(source_table_full_name: str, key_columns: Iterable, order_by: str) -> str:
+        # the first row per key in order_by is kept; WHERE TRUE, as older BigQuery versions allowed QUALIFY only with WHERE, GROUP BY or HAVING
+        return (
+            "("
+            "\n    SELECT *"
+            f"\n    FROM {source_table_full_name}"
+            "\n    WHERE TRUE"
+            f"\n    QUALIFY ROW_NUMBER() OVER (PARTITION BY {', '.join(key_columns)} ORDER BY {order_by}) = 1"
+            "\n)"
+        )
 
     def delete_rows(self, table: str, condition: str) -> bigquery.QueryJob:
         """
@@ -180,6 +412,48 @@ class BQHelper(SQLhelper):
         job.result()
         return job
 
+    def query_to_table(self, query: str, table: str, replace: bool = True) -> bigquery.QueryJob:
+        """
+        Write a query result to a BigQuery table with one CREATE TABLE ... AS SELECT statement.
+        The data stays in BigQuery, unlike query_to_df followed by df_to_table.
+
+        Args:
+            query (str): SELECT query.
+            table (str): Target table name (optionally prefixed with dataset).
+            replace (bool): If True, an existing table is replaced, else the statement fails if the table exists.
+
+        Returns:
+            QueryJob: Result of CREATE TABLE query.
+        """
+        table_full = self.full_table_name(table)
+        create_statement = "CREATE OR REPLACE TABLE" if replace else "CREATE TABLE"
+        job = self.client.query(f"{create_statement} `{table_full}` AS\n{query}")
+        job.result()
+        logger.info(f"Query result was written to {table_full}")
+        return job
+
+    def set_clustering(self, table: str, cluster_by: Iterable) -> bool:
+        """
+        Sets clustering columns of an existing table, if they differ.
+        Only data written after the change is clustered, older data is reclustered by BigQuery in the background.
+
+        Args:
+            table (str): Table name (optionally prefixed with dataset).
+            cluster_by (Iterable): Clustering columns (up to 4), in order.
+
+        Returns:
+            bool: True if clustering was changed, else False.
+        """
+        table_full = self.full_table_name(table)
+        cluster_by = list(cluster_by)
+        table_ref = self.client.get_table(table_full)
+        if table_ref.clustering_fields == cluster_by:
+            return False
+        table_ref.clustering_fields = cluster_by
+        self.client.update_table(table_ref, ["clustering_fields"])
+        logger.info(f"{table_full} is clustered by {', '.join(cluster_by)}")
+        return True
+
     def merge(
         self,
         destination_table: str,
@@ -188,34 +462,58 @@ class BQHelper(SQLhelper):
         insert_columns: str | Iterable = (),
         update_columns: str | Iterable = (),
         raise_duplicates_error: bool = True,
+        key_range_hint: bool = False,
+        cluster_by: str | Iterable = (),
+        deduplicate_order_by: str = None,
     ) -> Any:
         """
         Merge source table into destination table using BigQuery SQL MERGE statement.
+        With key_range_hint=True, destination rows are additionally filtered by the min/max key values of the source,
+        which reduces scanned bytes if the destination table is clustered or partitioned by the key columns.
 
         Args:
             destination_table (str): Target table to merge into (optionally prefixed with dataset).
             source_table (str): Source table with new data (optionally prefixed with dataset).
             key_columns (str | Iterable): Keys to match on.
             insert_columns (str | Iterable): Columns to insert.
-            update_columns (str | Iterable): Columns to update.
+            update_columns (str | Iterable): Columns to update. If empty (key columns are not counted),
+                new rows are appended with INSERT, existing rows are not touched.
             raise_duplicates_error (bool): Whether to raise error on duplicates.
+            key_range_hint (bool): Whether to limit destination rows to the range of source keys.
+                The range is read in the same query as the duplicates check.
+            cluster_by (str | Iterable): If set, the destination table is clustered by these columns (usually key_columns)
+                before merge. Together with key_range_hint it lets MERGE skip blocks outside of the source keys range.
+            deduplicate_order_by (str): If set, only the first source row per key in this order is merged,
+                e.g. "_dlt_load_id DESC". Rows tied in this order are picked arbitrarily, so it should identify a row
+                within a key. Use it with raise_duplicates_error=False, otherwise source duplicates raise before merge.
+                By default the source is merged as is, and BigQuery fails the MERGE if a destination row matches
+                several source rows.
 
         Returns:
             QueryJob: Result of MERGE query.
         """
-
-        # Check for duplicates before executing merge
-        self.check_duplicates(
-            source_table, 
-            key_columns,
-            raise_duplicates_error
-        )
-        self.check_duplicates(
-            destination_table, 
+        if isinstance(key_columns, str):
+            key_columns = [key_columns]
+        if isinstance(cluster_by, str):
+            cluster_by = [cluster_by]
+        if isinstance(update_columns, str):
+            update_columns = [update_columns]
+        key_columns_set = frozenset(key_columns)
+        update_columns = [col for col in update_columns if col not in key_columns_set]
+
+        # Check for duplicates (and get the source keys range if needed) with one query before executing merge.
+        # Insert-only merge doesn't update destination rows, so duplicates in the destination don't affect it.
+        checked_tables = [source_table, destination_table] if update_columns else [source_table]
+        _, key_range_parameters = self._check_duplicates_and_key_range(
+            checked_tables,
             key_columns,
-            raise_duplicates_error
+            raise_duplicates_error,
+            key_range_table=source_table if key_range_hint else None,
         )
 
+        if cluster_by:
+            self.set_clustering(destination_table, cluster_by)
+
         destination_full = self.full_table_name(destination_table)
         source_full = self.full_table_name(source_table)
 
@@ -224,16 +522,23 @@ class BQHelper(SQLhelper):
             source_table_full_name=source_full,
             key_columns=key_columns,
             insert_columns=insert_columns,
-            update_columns=update_columns
+            update_columns=update_columns,
+            extra_match_conditions=self._key_range_conditions(key_columns) if key_range_hint else (),
+            source_clause=(
+                self._deduplicated_source(source_full, key_columns, deduplicate_order_by)
+                if deduplicate_order_by else None
+            ),
         )
 
+        job_config = bigquery.QueryJobConfig(query_parameters=key_range_parameters)
+
         logger.debug(f"Executing query... \n{merge_query}")
-        job = self.client.query(merge_query)
+        job = self.client.query(merge_query, job_config=job_config)
         job.result()
         result_info = job._properties.get("statistics").get("query").get("dmlStats")
         logger.info(
             f"Merged {source_full} into {destination_full}"
-            f"\nKey columns: self.key_columns"
+            f"\nKey columns: {', '.join(key_columns)}"
             f"\nInserted rows: {result_info.get('insertedRowCount')}"
             f"\nUpdated rows: {result_info.get('updatedRowCount')}"
         )
@@ -1,11 +1,20 @@
+import hashlib
 import os
+import tempfile
 import time
 
 import json
-from copy import deepcopy
-from typing import Literal, Iterable, get_args
-
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from threading import Lock, local
+from typing import IO, Literal, Iterable, get_args
+
+import orjson
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 import dlt
 from dlt.sources.helpers import requests
 from google.cloud import storage
@@ -13,9 +22,28 @@ from google.cloud import storage
 import logging
 logger = logging.getLogger(__name__)
 
-def check_literal_values(val: str, arg_name: str, literal_type) -> str:
+# Shared HTTP client: connections to an API are kept alive and reused between requests.
+# dlt creates a separate session for each thread on top of the same connection pool.
+# 429 and 5xx responses and dropped connections are retried with exponential backoff
+# (waiting as long as the Retry-After header asks, if it is sent), so one transient error doesn't fail the whole load.
+http_client = requests.Client(
+    max_connections=16,
+    request_max_attempts=8,
+    request_backoff_factor=1.5,
+    request_max_retry_delay=60,
+    respect_retry_after_header=True,
+)
+
+@lru_cache(maxsize=None)
+def _literal_values(literal_type) -> tuple[tuple, frozenset]:
+    # Literal types are hashable and don't change, their values are read once
     valid_values = get_args(literal_type)
-    if val not in valid_values:
+    return valid_values, frozenset(valid_values)
+
+
+def check_literal_values(val: str, arg_name: str, literal_type) -> str:
+    valid_values, valid_values_set = _literal_values(literal_type)
+    if val not in valid_values_set:
         valid_vals_str = ", ".join(f"'{v}'" for v in valid_values)
         raise ValueError(
             f"Invalid value '{val}' for argument '{arg_name}'. "
@@ -31,11 +59,52 @@ def format_dict_str(dict_to_print: dict, header: str = "") -> str:
     return message
 
 
-def bytes_to_gcs(content: bytes, gcs_bucket: str, path: str): 
-    client = storage.Client()
+# Bytes content bigger than this is uploaded to GCS in chunks by a resumable upload
+GCS_CHUNKED_UPLOAD_THRESHOLD = 16 * 1024 * 1024
+GCS_UPLOAD_CHUNK_SIZE = 15 * 1024 * 1024  # a multiple of 256 KiB
+
+_gcs_clients = local()
+
+def get_gcs_client() -> storage.Client:
+    """
+    Returns a GCS client of the current thread, created on the first call in the thread and reused after it.
+    Its authorized requests session is not documented as thread-safe, so threads (e.g. upload workers) don't share it.
+    """
+    client = getattr(_gcs_clients, "client", None)
+    if client is None:
+        client = _gcs_clients.client = storage.Client()
+    return client
+
+
+def bytes_to_gcs(
+    content: bytes | IO[bytes],
+    gcs_bucket: str,
+    path: str,
+    chunk_size: int = None,
+    client: storage.Client = None,
+):
+    """
+    Uploads bytes or a binary file-like object to a GCS blob.
+
+    File-like objects are read while uploading, so the content doesn't have to be held in memory as a whole.
+    If chunk_size is set (must be a multiple of 256 KiB), a resumable upload sends the data in chunks of this size.
+    Bytes bigger than GCS_CHUNKED_UPLOAD_THRESHOLD are sent in chunks of GCS_UPLOAD_CHUNK_SIZE if chunk_size is not set.
+    If client is not passed, a client of the current thread is used, see get_gcs_client.
+    """
+    if chunk_size is None and isinstance(content, bytes) and len(content) > GCS_CHUNKED_UPLOAD_THRESHOLD:
+        chunk_size = GCS_UPLOAD_CHUNK_SIZE
+    client = client or get_gcs_client()
     bucket = client.bucket(gcs_bucket)
-    blob = bucket.blob(path)
-    blob.upload_from_string(content, content_type="application/octet-stream")
+    blob = bucket.blob(path, chunk_size=chunk_size)
+    if isinstance(content, bytes):
+        if chunk_size is None:
+            blob.upload_from_string(content, content_type="application/octet-stream")
+        else:
+            blob.upload_from_file(
+                BytesIO(content), size=len(content), content_type="application/octet-stream"
+            )
+    else:
+        blob.upload_from_file(content, content_type="application/octet-stream")
     logger.info(f"Uploaded {path} to GCS bucket {gcs_bucket}")
 
 
@@ -45,9 +114,10 @@ def flatten_dict_by_key(nested_dict: dict, keys: Iterable):
 
     For each key in `keys`, if it exists in `nested_dict` and its value is a dict,
     it is used to update the top-level dict. The original key is deleted.
+    Keys that are missing or don't hold a dict are left as they are.
     In case of a collision, old keys get rewritten by new.
 
-    This function does not modify the original input.
+    This function does not modify the original input; nested values are shared with it, not copied.
 
     Args:
         nested_dict (dict): The input dict object.
@@ -56,18 +126,177 @@ def flatten_dict_by_key(nested_dict: dict, keys: Iterable):
     Returns:
         dict: A new dict object with flattened structure.
     """
-    result = deepcopy(nested_dict)
-    for key in keys:
+    flattened_keys = [key for key in keys if isinstance(nested_dict.get(key), dict)]
+    skipped_keys = set(flattened_keys)
+    result = {key: val for key, val in nested_dict.items() if key not in skipped_keys}
+    for key in flattened_keys:
         result.update(nested_dict[key])
-        del result[key]
     return result
 
 
-def google_sheet_to_df(sheet_url: str) -> str:
-    return pd.read_csv(sheet_url.replace("/edit?gid=", "/export?format=csv&gid="))
+# Strings read as nulls by pandas.read_csv by default
+PANDAS_NA_VALUES = (
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+)
+
+
+def _csv_to_df(content: bytes, column_types: dict = None) -> pd.DataFrame:
+    """
+    Parses CSV bytes with the pyarrow CSV reader to the same DataFrame pandas.read_csv would return with defaults:
+    the same strings are nulls, only True/False spellings are booleans (not 1/0),
+    dates and times are kept as strings, columns without values are float64 NaN.
+    """
+    convert_options = pa_csv.ConvertOptions(
+        null_values=PANDAS_NA_VALUES,
+        strings_can_be_null=True,
+        true_values=["True", "TRUE", "true"],
+        false_values=["False", "FALSE", "false"],
+        column_types=column_types,
+    )
+    table = pa_csv.read_csv(pa.BufferReader(content), convert_options=convert_options)
+
+    # pyarrow infers dates and timestamps, pandas doesn't: such columns are read again as strings
+    temporal_columns = {
+        field.name: pa.string() for field in table.schema if pa.types.is_temporal(field.type)
+    }
+    if temporal_columns and column_types is None:
+        return _csv_to_df(content, column_types=temporal_columns)
+
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+    return table.to_pandas()
+
+
+def _write_file_atomically(path: str, content: bytes):
+    # a reader sees either the old or the new file, never a partially written one;
+    # the temporary file name is unique, so concurrent writers (threads or processes) don't share it
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path), prefix=os.path.basename(path), suffix=".tmp", delete=False
+    ) as f:
+        f.write(content)
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        os.remove(f.name)
+        raise
+
+
+def _read_sheet_cache_meta(meta_path: str) -> dict | None:
+    # None if there is no metadata or it can't be read, then the sheet is downloaded again
+    try:
+        with open(meta_path, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def google_sheet_to_df(sheet_url: str, cache_dir: str = None, cache_ttl: int = 0) -> pd.DataFrame:
+    """
+    Reads a Google Sheet (shared by link) to a pandas DataFrame.
+    The sheet is downloaded as CSV with the shared HTTP client and parsed by the multithreaded pyarrow CSV reader.
+
+    Args:
+        sheet_url (str): Sheet URL.
+        cache_dir (str, optional): Local directory to cache the CSV export in, together with a small metadata file
+            (time of the last download or check and the ETag of the response, if it had one).
+            If the cached sheet has an ETag, it is requested with If-None-Match and read from the cache if it wasn't changed.
+            Defaults to None (no caching).
+        cache_ttl (int, optional): Seconds after the last download or check during which the cached sheet is read
+            without requesting it at all. Defaults to 0 (always request).
+
+    Returns:
+        pd.DataFrame: Sheet content.
+    """
+    export_url = sheet_url.replace("/edit?gid=", "/export?format=csv&gid=")
+    if cache_dir is None:
+        return _csv_to_df(http_client.get(export_url).content)
+
+    cache_key = hashlib.md5(export_url.encode("UTF-8"), usedforsecurity=False).hexdigest()
+    csv_path = os.path.join(cache_dir, f"{cache_key}.csv")
+    meta_path = os.path.join(cache_dir, f"{cache_key}.json")
+
+    meta = _read_sheet_cache_meta(meta_path) if os.path.exists(csv_path) else None
+    request_headers = {}
+    if meta is not None:
+        if time.time() - meta["checked_at"] < cache_ttl:
+            logger.info(f"Reading sheet {sheet_url} from cache {csv_path}")
+            with open(csv_path, "rb") as f:
+                return _csv_to_df(f.read())
+        if meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+
+    response = http_client.get(export_url, headers=request_headers)
+    if response.status_code == 304 and meta is not None:
+        logger.info(f"Sheet {sheet_url} was not changed, reading it from cache {csv_path}")
+        _write_file_atomically(meta_path, orjson.dumps({**meta, "checked_at": time.time()}))
+        with open(csv_path, "rb") as f:
+            return _csv_to_df(f.read())
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # the old metadata is removed first and the new one is written last,
+    # so an interrupted update doesn't leave metadata next to a CSV it doesn't belong to
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    _write_file_atomically(csv_path, response.content)
+    _write_file_atomically(
+        meta_path, orjson.dumps({"checked_at": time.time(), "etag": response.headers.get("ETag")})
+    )
+    return _csv_to_df(response.content)
+
+
+def google_sheets_to_dfs(
+    sheet_urls: dict,
+    max_workers: int = 4,
+    cache_dir: str = None,
+    cache_ttl: int = 0,
+) -> dict:
+    """
+    Reads several Google Sheets (shared by link) to pandas DataFrames, downloading them concurrently.
+
+    Args:
+        sheet_urls (dict): Sheet URLs by any keys.
+        max_workers (int, optional): Maximum number of sheets downloaded at the same time. Defaults to 4.
+        cache_dir (str, optional): Local directory to cache sheets in, see google_sheet_to_df. Defaults to None.
+        cache_ttl (int, optional): Seconds the cached sheets are read without a check, see google_sheet_to_df. Defaults to 0.
+
+    Returns:
+        dict: DataFrames by the same keys as in sheet_urls.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        dfs = executor.map(
+            lambda sheet_url: google_sheet_to_df(sheet_url, cache_dir=cache_dir, cache_ttl=cache_ttl), sheet_urls.values()
+        )
+        return dict(zip(sheet_urls.keys(), dfs))
+
+
+class RateLimiter:
+    """
+    Spaces calls out in time: wait() returns not earlier than `delay` seconds after the previous call was let through.
+    Thread-safe, callers are let through in the order they called wait().
+    """
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._lock = Lock()
+        self._next_time = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_until = max(now, self._next_time)
+            self._next_time = wait_until + self.delay
+        time.sleep(wait_until - now)
 
 
 PaginatedSourceResponseFormat = Literal["json", "parquet"]
+# parsers of a page response content by response format
+_PAGE_PARSERS = {
+    "parquet": lambda content: content,
+    # orjson (installed with dlt) parses bytes directly, skipping the text decoding step
+    "json": lambda content: orjson.loads(content)["result"],
+}
+UPLOAD_WORKERS = 4  # concurrent uploads of raw pages to GCS in paginated_source
 @dlt.source
 def paginated_source(
     url: str,
@@ -78,6 +307,7 @@ def paginated_source(
     end_page: int = None,
     allow_no_end_page=False,
     delay: int = 1,
+    max_workers: int = 1,
     upload_to_gcs: bool = False,
     storage_path: str = None,
     file_name: str = None,
@@ -96,6 +326,10 @@ def paginated_source(
         end_page (int, optional): The last page number to fetch. If None, must set `allow_no_end_page=True`.
         allow_no_end_page (bool, optional): Continues fetching until an empty response. Defaults to False.
         delay (int, optional): Delay in seconds between requests to avoid rate limiting. Defaults to 1.
+        max_workers (int, optional): Maximum number of pages requested concurrently. Defaults to 1.
+            Requests are still sent not more often than once per `delay` seconds.
+            Up to `max_workers - 1` pages after the first empty one may be requested (not after `end_page`, if it is set),
+            their responses are discarded.
         upload_to_gcs (bool, optional): Whether to upload raw responses to GCS. Defaults to False.
         storage_path (str, optional): GCS folder path prefix where files will be stored. Required if `upload_to_gcs=True`.
         file_name (str, optional): Base file name for uploaded files. Required if `upload_to_gcs=True`.
@@ -110,6 +344,7 @@ def paginated_source(
         # Input checks:
 
         check_literal_values(response_format, "response_format", PaginatedSourceResponseFormat)
+        parse_page = _PAGE_PARSERS[response_format]
 
         if end_page is None and not allow_no_end_page:
             raise ValueError("Define end_page or set allow_no_end_page=True.")
@@ -122,7 +357,10 @@ def paginated_source(
             else:
                 full_path = storage_path + file_name
 
-        if "page" in queryparams:
+        # Copy once: the caller's dict is not modified and is not read again during requests
+        base_params = dict(queryparams or {})
+
+        if "page" in base_params:
             raise ValueError(
                 "Define page through start_page and end_page parameters, not in queryparams."
             )
@@ -130,69 +368,92 @@ def paginated_source(
         if end_page is not None and start_page > end_page:
             raise ValueError("Start_page can not be greater than end_page.")
 
-        # Fetching data
+        if max_workers < 1:
+            raise ValueError("max_workers must be a positive integer.")
 
-        page = start_page
+        # Fetching data
 
-        logger.info(
-            f"dlt resource going to request data...\n"
-            f"URL: {url}\n" 
-            f"Pages form {start_page} to {end_page if end_page else 'first empty page'}"
-        )
-        logger.info(f"Response format: {PaginatedSourceResponseFormat}")
+        # request settings are logged as one message
+        settings_lines = [
+            "dlt resource going to request data...",
+            f"URL: {url}",
+            f"Pages form {start_page} to {end_page if end_page else 'first empty page'}",
+            f"Response format: {response_format}",
+        ]
         if headers:
-            logger.info(f"Headers: {headers}")
-        logger.info(
-            format_dict_str(
-                queryparams,
-                "Request parameters:",
-            )
-        )
-        logger.info(f"Delay: {delay}")
-
+            settings_lines.append(f"Headers: {headers}")
+        settings_lines.append(format_dict_str(base_params, "Request parameters:"))
+        settings_lines.append(f"Delay: {delay}")
+        settings_lines.append(f"Max concurrent requests: {max_workers}")
         if upload_to_gcs:
-            logger.info(f"Raw data will be loaded in GCS bucket '{gcs_bucket}', path '{storage_path}, file name pattern '{file_name}'")
+            settings_lines.append(
+                f"Raw data will be loaded in GCS bucket '{gcs_bucket}', path '{storage_path}, file name pattern '{file_name}'"
+            )
+        logger.info("\n".join(settings_lines))
 
-        while True:
-            # Stop at end_page if defined
-            if end_page is not None and page > end_page:
-                logger.info("The last page was received")
-                break
+        rate_limiter = RateLimiter(delay)
 
+        def request_page(page: int):
+            # Delay based on API frequency restrictions, waiting happens in the worker threads,
+            # so responses which are already received are processed meanwhile
+            rate_limiter.wait()
             logger.info(f"Requesting page {page}...")
-
-            # Create a shallow copy of the queryparams dict to avoid mutating the input
-            params = dict(queryparams or {})
-            params["page"] = page
-
-            response = requests.get(url, headers=headers or {}, params=params)
-            if response_format == "parquet":
-                data = response.content
-            elif response_format == "json":
-                data = response.json()["result"]
-
+            # Pages are requested from worker threads concurrently, so each request gets its own small dict
+            response = http_client.get(url, headers=headers or {}, params={**base_params, "page": page})
             logger.info(f"Page {page} was received")
-
-            if not data:
-                logger.info(f"No data was received in a response for page {page}")
-                break
-
-            # Upload raw data to file in Google Cloud Storage if required
-            if upload_to_gcs:
-                logger.info(f"Loading page {page} content to GCS...")
-                full_file_path = full_path + f"_{page}.{response_format}"
-                bytes_to_gcs(
-                    response.content,
-                    gcs_bucket=gcs_bucket,
-                    path=full_file_path,
-                )
-
-            yield data
-
-            page += 1
-
-            # Delay based on API frequency restrictions
-            time.sleep(delay)
+            # Parsed in the worker thread as well, overlapping with the other requests
+            return response.content, parse_page(response.content)
+
+        # Up to max_workers pages are requested at the same time.
+        # Requests are sent not more often than once per `delay` seconds, responses are processed in the pages order.
+        # Raw pages are uploaded to GCS in the background, overlapping with the next requests.
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as upload_executor:
+            requested_pages = deque()
+            uploads = deque()
+            next_page = start_page
+            while True:
+                while len(requested_pages) < max_workers and (end_page is None or next_page <= end_page):
+                    requested_pages.append(
+                        (next_page, executor.submit(request_page, next_page))
+                    )
+                    next_page += 1
+
+                # Stop at end_page if defined
+                if not requested_pages:
+                    logger.info("The last page was received")
+                    break
+
+                page, future = requested_pages.popleft()
+                content, data = future.result()
+
+                if not data:
+                    logger.info(f"No data was received in a response for page {page}")
+                    for _, pending_future in requested_pages:
+                        pending_future.cancel()
+                    break
+
+                # Upload raw data to file in Google Cloud Storage if required
+                if upload_to_gcs:
+                    logger.info(f"Loading page {page} content to GCS...")
+                    full_file_path = full_path + f"_{page}.{response_format}"
+                    # Limit the number of pages held in memory while waiting for upload
+                    while len(uploads) >= 2 * UPLOAD_WORKERS:
+                        uploads.popleft().result()
+                    uploads.append(
+                        upload_executor.submit(
+                            bytes_to_gcs,
+                            content,
+                            gcs_bucket=gcs_bucket,
+                            path=full_file_path,
+                        )
+                    )
+
+                yield data
+
+            # Wait for the remaining uploads, errors are raised here
+            while uploads:
+                uploads.popleft().result()
 
     return get_pages
 
@@ -1,3 +1,4 @@
+from copy import deepcopy
 from typing import Any, Literal
 from common.utils import check_literal_values
 from key import API_KEY
@@ -17,10 +18,10 @@ class PipelineParams:
         "x-rapidapi-host": "daily-international-job-postings.p.rapidapi.com",
     }
 
-    # request_type can be "search" or "count"
     # search - get job postings page by page, default is 10 items per page
+    URL_SEARCH = "https://daily-international-job-postings.p.rapidapi.com/api/v2/jobs/search"
     # count - get total count of job postings
-    URL = "https://daily-international-job-postings.p.rapidapi.com/api/v2/jobs/{request_type}"
+    URL_COUNT = "https://daily-international-job-postings.p.rapidapi.com/api/v2/jobs/count"
 
     STATIC_QUERYPARAMS = {
         "countryCode": "de",
@@ -40,6 +41,17 @@ class PipelineParams:
             "prod": None,
         },
         "date_created_delta_days": 7,
+        # the number of pages requested concurrently, requests are still sent not more often than once per second
+        # raise only if the API subscription allows parallel requests
+        "max_workers": 1,
+    }
+
+    # dlt load settings
+    DLT_SETTINGS = {
+        # Parquet files are smaller to upload and faster to load in BigQuery than the default JSONL
+        "loader_file_format": "parquet",
+        # rows per load file, fewer and bigger load jobs
+        "file_max_items": 100_000,
     }
 
     # Google Cloud parameters
@@ -88,6 +100,11 @@ class PipelineParams:
         "positions": "https://docs.google.com/spreadsheets/d/1clAiWIVMD5bCJRHJr9-p2vw9h99W5sByAtqThIGREpo/edit?gid=1908800533#gid=1908800533",
     }
 
+    # local directory to cache mapping rules sheets in between runs, unchanged sheets are not downloaded again
+    MAPPING_RULES_CACHE_DIR = "/tmp/jobs_research/mapping_rules"
+    # seconds during which cached sheets are used without checking them for changes
+    MAPPING_RULES_CACHE_TTL = 3600
+
     def __init__(self, server: ParamsServer):
         check_literal_values(server, "server", ParamsServer)
         self.server = server
@@ -102,19 +119,25 @@ class PipelineParams:
         params = {"server": self.server}
 
         params["query_headers"] = self.QUERY_HEADERS
-        params["url"] = self.URL
+        params["url_search"] = self.URL_SEARCH
+        params["url_count"] = self.URL_COUNT
         params["queryparams"] = self.STATIC_QUERYPARAMS
 
         params["query_settings"] = {}
         for key, val in self.QUERY_SETTINGS.items():
             params["query_settings"][key] = self.resolve_env_config(val)
 
+        params["dlt_settings"] = self.DLT_SETTINGS
+
         params["gcp"] = {}
         for key, val in self.GCP_PARAMS.items():
             params["gcp"][key] = self.resolve_env_config(val)
 
         params["mapping_rules_urls"] = self.MAPPING_RULES_URLS
+        params["mapping_rules_cache_dir"] = self.MAPPING_RULES_CACHE_DIR
+        params["mapping_rules_cache_ttl"] = self.MAPPING_RULES_CACHE_TTL
         params["final_df_cols"] = self.FINAL_DFS_COLS
 
-        self.params = params
-        return params
+        # pipelines modify their params (e.g. dateCreated in queryparams), class-level defaults must stay intact
+        self.params = deepcopy(params)
+        return self.params
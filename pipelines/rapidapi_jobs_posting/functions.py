@@ -1,16 +1,16 @@
 import datetime as dt
-from io import BytesIO
 import hashlib
 from math import ceil
 import pandas as pd
+import pyarrow as pa
 import pyarrow.parquet as pq
 import re
+import string
 from typing import Iterable 
 
 import dlt
-from dlt.sources.helpers import requests
 
-from common.utils import flatten_dict_by_key
+from common.utils import flatten_dict_by_key, http_client
 from common.bq_helper import BQHelper
 
 import logging
@@ -18,56 +18,82 @@ logger = logging.getLogger(__name__)
 
 #load pipeline functions
 
+FLATTEN_KEYS = ("jsonLD",)  # nested dicts of a job post moved to the top level
+
 def count_pages(
     url: str,
     queryparams: dict = None,  
     headers: dict = None,
     items_per_page: int = 10,
 ):
-    response_count = requests.get(
+    response_count = http_client.get(
         url, headers=headers or {}, params=queryparams or {}
     )
 
-    parquet_bytes = response_count.content
-    buffer = BytesIO(parquet_bytes)
-    table = pq.read_table(buffer)
-    df = table.to_pandas()
+    # read the single needed value straight from Arrow, without building a DataFrame;
+    # BufferReader reads the response bytes in place, without copying them to a file-like object
+    table = pq.read_table(pa.BufferReader(response_count.content), columns=["totalCount"])
 
-    jobs_count = df["totalCount"][0]
+    jobs_count = table.column("totalCount")[0].as_py()
     max_pages = ceil(jobs_count / items_per_page)
 
-    print(f'{jobs_count} posts found by request, the maximum amount of pages are {max_pages}')
+    logger.info(f"{jobs_count} posts found by request, the maximum amount of pages are {max_pages}")
     
     return max_pages
 
 @dlt.resource(write_disposition="append", table_name="jobs_posting")
 def flattened_jobs_posting(source):
     for record in source.resources["get_pages"]():
-        yield flatten_dict_by_key(nested_dict=record, keys=["jsonLD"])
+        yield flatten_dict_by_key(nested_dict=record, keys=FLATTEN_KEYS)
 
 
 #Transform pipeline functions
 
+# pieces of a string used to compare text attributes: start, middle and end of long texts
+STRING_ID_SLICES = ((0, 100), (500, 550), (1500, 1550), (-300, -250))
+_NOT_LETTERS_RE = re.compile("[^a-zA-Z]+")
+# ASCII bytes which are not latin letters, deleted with bytes.translate (faster than _NOT_LETTERS_RE.sub)
+_NOT_LETTERS_BYTES = bytes(c for c in range(128) if chr(c) not in string.ascii_letters)
+
 def get_string_id(s :str) -> str:
     """
     Result used to compare text attributes.
     Take several short pieces of string not to work with long string (description)
     Delete everything except letters so as not to depend on different portals' formatting and parsing errors
+    Missing values (None, NaN, pd.NA) are empty strings, as in get_string_ids
     """
-    if s is None:
+    if s is None or pd.isna(s):
         return ""
     else:
-        s_part = "".join([
-            s[:100], 
-            s[500:550], 
-            s[1500:1550], 
-            s[-300:-250]
-        ]).lower()
-        return re.sub("[^a-zA-Z]+", "", s_part)
+        s_part = "".join([s[start:stop] for start, stop in STRING_ID_SLICES]).lower()
+        # non-ASCII characters are dropped by encoding, the rest of non-letters by translate
+        return s_part.encode("ascii", "ignore").translate(None, _NOT_LETTERS_BYTES).decode("ascii")
 
 def get_post_id(attr_list :Iterable) -> str:
     attr_parts_str = "".join([get_string_id(s) for s in attr_list])
-    return hashlib.sha1(attr_parts_str.encode("UTF-8")).hexdigest()
+    # SHA-1 is kept so that ids of already loaded posts don't change, it is a fingerprint, not a security measure
+    return hashlib.sha1(attr_parts_str.encode("UTF-8"), usedforsecurity=False).hexdigest()
+
+def get_string_ids(s: pd.Series) -> pd.Series:
+    """Vectorized get_string_id for a Series of strings"""
+    # Arrow-backed strings: .str methods below run as Arrow compute kernels
+    s = s.astype("string[pyarrow]").fillna("")
+    start, stop = STRING_ID_SLICES[0]
+    s_part = s.str.slice(start, stop)
+    for start, stop in STRING_ID_SLICES[1:]:
+        s_part += s.str.slice(start, stop)
+    return s_part.str.lower().str.replace(_NOT_LETTERS_RE.pattern, "", regex=True)
+
+def get_post_ids(df: pd.DataFrame) -> pd.Series:
+    """Vectorized get_post_id for every row of a DataFrame, columns are used in their order"""
+    attr_parts = pd.Series("", index=df.index)
+    for col in df.columns:
+        attr_parts += get_string_ids(df[col])
+    sha1 = hashlib.sha1  # local name, looked up once for all rows
+    return pd.Series(
+        [sha1(x.encode("UTF-8"), usedforsecurity=False).hexdigest() for x in attr_parts.tolist()],
+        index=df.index,
+    )
 
 
 class LoadsLogger():
@@ -78,8 +104,12 @@ class LoadsLogger():
     def __init__(self, df_posting, pipeline_name, dataset, project):
         self.bqh = BQHelper(project=project, default_dataset=dataset)
 
-        self.df_new_loads = pd.DataFrame(df_posting["_dlt_load_id"].drop_duplicates()).copy(deep = True)
-        self.df_new_loads.rename(columns={"_dlt_load_id":"dlt_load_id"}, inplace=True)
+        # drop_duplicates and rename return a new frame, df_posting is not affected
+        self.df_new_loads = (
+            df_posting[["_dlt_load_id"]]
+            .drop_duplicates()
+            .rename(columns={"_dlt_load_id": "dlt_load_id"})
+        )
         self.pipeline_name = pipeline_name
         self.df_new_loads["processed_by"] = pipeline_name
 
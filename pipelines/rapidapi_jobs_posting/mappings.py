@@ -12,6 +12,8 @@ logger = logging.getLogger(__name__)
 
 MISSING = Sentinel('MISSING')
 REPLACE_WITH_SPACES = r"[!\"$\%'()\+,\-./:;?]"
+CHARS_REPLACED_WITH_SPACES = "!\"$%'()+,-./:;?"  # characters matched by REPLACE_WITH_SPACES
+_REPLACE_WITH_SPACES_TABLE = str.maketrans(dict.fromkeys(CHARS_REPLACED_WITH_SPACES, " "))
 
 def prepare_text(
     text: str,
@@ -25,8 +27,11 @@ def prepare_text(
     if not spaces_sensitive:
         text = text.replace(" ", "")
     else:
-
-        text = re.sub(replace_with_spaces, " ", text)
+        if replace_with_spaces == REPLACE_WITH_SPACES:
+            # single-character replacement, str.translate is faster than a regex substitution
+            text = text.translate(_REPLACE_WITH_SPACES_TABLE)
+        else:
+            text = re.sub(replace_with_spaces, " ", text)
         text = " " + text.strip() + " "
     return text
 
@@ -58,6 +63,20 @@ def link_skills_to_clouds(skills_set: set) -> dict:
     return cloud_skills_sets
 
 
+def add_cloud_labels(skills: set, cloud_skills_sets: dict) -> set:
+    """
+    Enriches a set of skills with high-level labels in one pass:
+    a cloud platform, if any of its skills was found, and 'Cloud', if any cloud platform is in the result.
+    cloud_skills_sets is the output of link_skills_to_clouds.
+    """
+    result = skills | {
+        cloud for cloud, cloud_skills in cloud_skills_sets.items() if skills & cloud_skills
+    }
+    if not result.isdisjoint(cloud_skills_sets):
+        result.add("Cloud")
+    return result
+
+
 class _MappingDict:
     """
     Internal helper class used by MappingRules to store normalized keyword mappings.
@@ -68,10 +87,16 @@ class _MappingDict:
         case_sensitive (bool): Whether keyword search is case-sensitive.
         spaces_sensitive (bool): Whether keyword search should preserve spaces and special characters.
         is_prepared (bool): Whether rules are already normalized.
+        keywords_by_words_count (dict | None): For spaces-sensitive rules, prepared keywords without padding spaces,
+            grouped by the number of words. None for not prepared or spaces-insensitive rules.
 
     Methods:
         prepare():
             Normalizes all keywords in the mapping according to the case and space sensitivity rules.
+        find_all(text):
+            Returns the set of values for all keywords found in a prepared text.
+        find_first(text):
+            Returns the value of the first keyword (in rules order) found in a prepared text, MISSING if nothing is found.
     """
     def __init__(
         self,
@@ -83,6 +108,7 @@ class _MappingDict:
         self.case_sensitive = case_sensitive
         self.spaces_sensitive = spaces_sensitive
         self.is_prepared = False
+        self.keywords_by_words_count = None
 
     def prepare(self):
         if not self.is_prepared:
@@ -92,18 +118,49 @@ class _MappingDict:
                     key, self.case_sensitive, self.spaces_sensitive
                 )
                 prepared_rules[prepared_key] = val
-                for char in REPLACE_WITH_SPACES:
-                    if self.spaces_sensitive and prepared_key != key and char in key:
-                        logger.warning(
-                            f"'{char}' in the keyword '{key}' was replaced with a space.",
-                            UserWarning,
-                        )
+                if self.spaces_sensitive and prepared_key != key:
+                    for char in CHARS_REPLACED_WITH_SPACES:
+                        if char in key:
+                            logger.warning(
+                                f"'{char}' in the keyword '{key}' was replaced with a space."
+                            )
             self.rules = prepared_rules
+            if self.spaces_sensitive:
+                # Prepared spaces-sensitive keywords are padded with spaces, so they can match only whole words.
+                # Index them by the number of words to look up word sequences of a text
+                # instead of scanning the whole text for every keyword.
+                self.keywords_by_words_count = {}
+                for key in self.rules:
+                    words = key[1:-1]
+                    self.keywords_by_words_count.setdefault(words.count(" ") + 1, {})[words] = key
             self.is_prepared = True
         else:
-            logger.warning("MappingDict is already prepared.", UserWarning)
+            logger.warning("MappingDict is already prepared.")
         return self
 
+    def _find_keys(self, text: str) -> Iterable[str]:
+        if self.keywords_by_words_count is None:
+            return (key for key in self.rules if key in text)
+        words = text[1:-1].split(" ")
+        found_keys = []
+        for words_count, keywords in self.keywords_by_words_count.items():
+            for i in range(len(words) - words_count + 1):
+                key = keywords.get(" ".join(words[i:i + words_count]))
+                if key is not None:
+                    found_keys.append(key)
+        return found_keys
+
+    def find_all(self, text: str) -> set:
+        return {self.rules[key] for key in self._find_keys(text)}
+
+    def find_first(self, text: str):
+        if self.keywords_by_words_count is None:
+            return next((val for key, val in self.rules.items() if key in text), MISSING)
+        found_keys = set(self._find_keys(text))
+        if not found_keys:
+            return MISSING
+        return next(val for key, val in self.rules.items() if key in found_keys)
+
 MappingRulesFindFormat = Literal["any", "all"]
 class MappingRules:
     """
@@ -130,6 +187,10 @@ class MappingRules:
             If default_response is not specified, it defaults to:
                 - set() for find = "all"
                 - None for find = "any"
+        apply_series(texts, default_response=MISSING, find):
+            Applies the mapping to each text of a pandas Series, every distinct text is processed only once.
+        apply_rows(df, default_response=MISSING, find):
+            Applies the mapping to texts of each pandas DataFrame row, every distinct row is processed only once.
     """
     def __init__(self, rules_df: pd.DataFrame, attr_name: str=""):
         self.attr_name = attr_name
@@ -183,7 +244,7 @@ class MappingRules:
             ]
             self._is_prepared = True
         else:
-            logger.warning("MappingRules are already prepared.", UserWarning)
+            logger.warning("MappingRules are already prepared.")
 
     def apply(
         self, 
@@ -213,17 +274,52 @@ class MappingRules:
                     text = prepare_text(
                         text, mapping_dict.case_sensitive, mapping_dict.spaces_sensitive
                     )
-                    for key, val in mapping_dict.rules.items():
-                        if key in text:
+                    if find == "all":
+                        found_values = mapping_dict.find_all(text)
+                        if found_values:
                             something_found = True
-                            if find == "all":
-                                result.add(val)
-                            if find == "any":
-                                return val
+                            result.update(found_values)
+                    if find == "any":
+                        found_value = mapping_dict.find_first(text)
+                        if found_value is not MISSING:
+                            return found_value
                 else:
-                        logger.warning(
-                            f"One of the texts for search is {text}.",
-                            UserWarning,
-                        )
+                        logger.warning(f"One of the texts for search is {text}.")
 
-        return result if something_found else default_response
\ No newline at end of file
+        return result if something_found else default_response
+
+    def apply_series(
+        self,
+        texts: pd.Series,
+        default_response=MISSING,
+        find: MappingRulesFindFormat="all",
+    ) -> pd.Series:
+        """
+        Applies the mapping to each text of a Series, same as texts.map(lambda x: self.apply([x])).
+        Every distinct text is searched only once, rows with the same text share the result object.
+        Null texts get the default response.
+        """
+        found = {
+            text: self.apply([text], default_response, find)
+            for text in texts.dropna().unique()
+        }
+        return texts.map(
+            lambda text: self.apply([], default_response, find) if pd.isna(text) else found[text]
+        )
+
+    def apply_rows(
+        self,
+        df: pd.DataFrame,
+        default_response=MISSING,
+        find: MappingRulesFindFormat="all",
+    ) -> pd.Series:
+        """
+        Applies the mapping to texts of each row, same as df.apply(self.apply, axis=1).
+        Every distinct row is searched only once, rows with the same texts share the result object.
+        """
+        rows = list(df.itertuples(index=False, name=None))
+        found = {}
+        for row in rows:
+            if row not in found:
+                found[row] = self.apply(row, default_response, find)
+        return pd.Series([found[row] for row in rows], index=df.index, dtype=object)
@@ -1,4 +1,5 @@
-from copy import deepcopy
+from datetime import timedelta
+
 import dlt
 
 from common.utils import (
@@ -19,17 +20,16 @@ def calculate_creation_date(execution_date, delta_days):
     date_created_folder = date_created.replace("-", "_")
     return date_created, month_created_folder, date_created_folder
 
-def get_end_page(url, headers, query_params, end_page=None)-> int:
+def get_end_page(url_count, headers, query_params, end_page=None)-> int:
     """
     Get the maximum number of pages for the job postings.
     If end_page is not defined, it will be calculated based on the total count of job postings.
     If end_page is defined, it will be used as is.
     """
     if end_page != 1:
-        queryparams_parquet = deepcopy(query_params)
-        queryparams_parquet["format"] = "parquet"
+        queryparams_parquet = {**query_params, "format": "parquet"}
         max_page = count_pages(
-            url.format(request_type="count"), queryparams=queryparams_parquet, headers=headers
+            url_count, queryparams=queryparams_parquet, headers=headers
         )
         if end_page is None:
             end_page = max_page 
@@ -47,27 +47,30 @@ def main(**kwargs):
     gcp_params = params["gcp"]
     queryparams = params["queryparams"]
     headers = params["query_headers"]
-    url = params["url"]
+    url_search = params["url_search"]
+    url_count = params["url_count"]
 
     query_settings = params["query_settings"]
     date_created_delta_days = query_settings["date_created_delta_days"]
     start_page = query_settings["start_page"]
     end_page = query_settings["end_page"]
+    max_workers = query_settings["max_workers"]
 
     date_created, month_created_folder, date_created_folder = calculate_creation_date(execution_date, date_created_delta_days)
     queryparams["dateCreated"] = date_created
-    end_page = get_end_page(url, headers, queryparams, end_page)
+    end_page = get_end_page(url_count, headers, queryparams, end_page)
 
     logger.info(f'Pages from {start_page} to {end_page} will be requested')
     logger.info("Getting postings data...")
 
     source = paginated_source(
-        url=url.format(request_type="search"),
+        url=url_search,
         response_format="json",
         queryparams=queryparams,
         headers=headers,
         start_page=start_page,
         end_page=end_page,
+        max_workers=max_workers,
         upload_to_gcs=True, #upload raw data to GCS
         gcs_bucket=gcp_params["gcs_bucket"],
         storage_path=gcp_params["gcs_storage_path"],
@@ -75,8 +78,9 @@ def main(**kwargs):
     )
         
     #Get job postings from RapidAPI, upload raw data to Google Cloud Storage (GCS), and normalized data to BigQuery.
+    pipeline_name = "job_postings_to_bq_pipeline"
     pipeline = dlt.pipeline(
-        pipeline_name="job_postings_to_bq_pipeline",
+        pipeline_name=pipeline_name,
         destination=dlt.destinations.bigquery(
             credentials=get_gcp_key(),
             dataset_name=gcp_params["bq_dwh_params"]["dataset_name"],
@@ -84,8 +88,12 @@ def main(**kwargs):
         )
     )
 
+    dlt_settings = params["dlt_settings"]
+    # set in the pipeline section, so other pipelines of the process keep their own settings
+    dlt.config[f"{pipeline_name}.normalize.data_writer.file_max_items"] = dlt_settings["file_max_items"]
     pipeline_info = pipeline.run(
         flattened_jobs_posting(source),
+        loader_file_format=dlt_settings["loader_file_format"],
     )
 
 if __name__=="__main__":
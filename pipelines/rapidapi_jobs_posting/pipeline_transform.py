@@ -1,24 +1,28 @@
 import sys
 
-from math import ceil
+import numpy as np
 import pandas as pd
 import datetime as dt
-from google.cloud import bigquery
 
-from common.utils import google_sheet_to_df
-from common.bq_helper import BQHelper
+from common.utils import google_sheets_to_dfs
+from common.bq_helper import BQHelper, get_bq_client
 
 from functions import (
-    get_post_id,
+    get_post_ids,
     LoadsLogger,
 )
 
 from mappings import(
     MappingRules,
     resolve_frankfurt_conflict,
-    link_skills_to_clouds
+    link_skills_to_clouds,
+    add_cloud_labels,
 )
 
+import logging
+from common.logging_config import setup_logging
+logger = logging.getLogger(__name__)
+
 pipeline_name = "jobs_posting_transform"
 
 
@@ -36,9 +40,13 @@ def main(**kwargs):
     bq_adb_params = params["gcp"]["bq_adb_params"]
     location = bq_dwh_params["location"]
     project = params["gcp"]["project"]
-    bq_client = bigquery.Client(location=location)
 
     dataset = bq_dwh_params["dataset_name"]
+    bq = BQHelper(
+        project=project,
+        default_dataset=dataset,
+        client=get_bq_client(location),
+    )
     source_tables_prefix = f"{project}.{dataset}."
     analytical_dataset = bq_adb_params["dataset_name"]
 
@@ -72,14 +80,14 @@ def main(**kwargs):
         ,url
         ,portal
         ,experience_requirements__months_of_experience
-        ,date_created
+        ,date(date_created) as date_created
         ,description 
     from `{source_tables_prefix}.jobs_posting` as jp
     inner join new_loads nl on jp._dlt_load_id = nl.load_id
     where locale = "en_DE"
     """
     logger.info(f"Fetching new data... \n{df_posting_load_query}")
-    df_posting = bq_client.query(df_posting_load_query).to_dataframe()
+    df_posting = bq.query_to_df(df_posting_load_query, arrow_strings=True)
     logger.info(
         f"Fetched {len(df_posting)} raws from `{source_tables_prefix}.jobs_posting`"
     )
@@ -91,12 +99,11 @@ def main(**kwargs):
     new_loads = LoadsLogger(df_posting, pipeline_name, dataset, project)
     new_loads.start()
     df_posting.drop(columns="_dlt_load_id", inplace=True)
-    df_posting['date_created'] = df_posting['date_created'].dt.date
     
     #----------------------------------------------------deal with doubled posts----------------------------------------
     
     #consider posts with the same title, description, location, and hiring company the same
-    df_posting["job_id"] = df_posting[["title", "company", "city", "description"]].apply(get_post_id, axis=1, raw=True)
+    df_posting["job_id"] = get_post_ids(df_posting[["title", "company", "city", "description"]])
     
     #marking the last post, only this one will go to the analytical table
     df_posting.sort_values(
@@ -104,7 +111,7 @@ def main(**kwargs):
         ascending=False, 
         inplace=True
     )
-    df_posting["is_source"] = df_posting.groupby(by="job_id").cumcount()==0
+    df_posting["is_source"] = ~df_posting["job_id"].duplicated(keep="first")
     
     #save mapping from old id on new
     df_dlt_to_post_id = df_posting[["_dlt_id", "job_id", "is_source"]].copy(deep = True)
@@ -117,16 +124,21 @@ def main(**kwargs):
 
     # ----------------------------------------------------normalize attributes-------------------------------------------
 
+    # mapping rules sheets are independent, download them at once
+    mapping_rules_dfs = google_sheets_to_dfs(
+        mapping_rules_urls,
+        cache_dir=params["mapping_rules_cache_dir"],
+        cache_ttl=params["mapping_rules_cache_ttl"],
+    )
+
     # normalize positions
 
     positions_rules = MappingRules(
-        google_sheet_to_df(mapping_rules_urls["positions"]),
+        mapping_rules_dfs["positions"],
         "positions",
     )
 
-    df_posting["positions"] = df_posting[["title", "occupation"]].apply(
-        positions_rules.apply, axis=1
-    )
+    df_posting["positions"] = positions_rules.apply_rows(df_posting[["title", "occupation"]])
 
     df_positions = (
         df_posting[["job_id", "title", "occupation", "positions"]]
@@ -146,15 +158,17 @@ def main(**kwargs):
     # normalize cities
 
     city_clusters_rules = MappingRules(
-        google_sheet_to_df(mapping_rules_urls["city_clusters"]),
+        mapping_rules_dfs["city_clusters"],
         "city_clusters",
     )
 
-    df_posting["city_clusters"] = df_posting["city"].map(
-        lambda x: (set() if pd.isna(x) else city_clusters_rules.apply([x]))
+    # clusters are found once per distinct city and mapped back on rows
+    cities = pd.Series(df_posting["city"].dropna().unique())
+    city_to_clusters = dict(
+        zip(cities, city_clusters_rules.apply_series(cities).map(resolve_frankfurt_conflict))
     )
-    df_posting["city_clusters"] = df_posting["city_clusters"].map(
-        resolve_frankfurt_conflict
+    df_posting["city_clusters"] = df_posting["city"].map(
+        lambda x: city_to_clusters.get(x, set())
     )
 
     df_city_clusters = (
@@ -169,9 +183,10 @@ def main(**kwargs):
 
     # normalize experience requirements
 
-    df_posting["years_of_experience"] = df_posting[
-        "experience_requirements__months_of_experience"
-    ].map(lambda x: None if pd.isna(x) else ceil(x / 12))
+    # nullable small integer: fewer bytes to upload than float64 or object
+    df_posting["years_of_experience"] = np.ceil(
+        df_posting["experience_requirements__months_of_experience"].astype("float64") / 12
+    ).astype("Int16")
     df_posting.drop(
         columns="experience_requirements__months_of_experience", inplace=True
     )
@@ -179,7 +194,7 @@ def main(**kwargs):
     # create list of skills
 
     skills_rules = MappingRules(
-        google_sheet_to_df(mapping_rules_urls["skills"]), "skills"
+        mapping_rules_dfs["skills"], "skills"
     )
 
     df_posting["skills"] = df_posting["description"].map(
@@ -189,34 +204,19 @@ def main(**kwargs):
     all_skills = skills_rules.rules_df.result.unique()
     cloud_skills_dict = link_skills_to_clouds(all_skills)
 
-    for cloud, cloud_skills in cloud_skills_dict.items():
-        # enrich the set of skills with high-level cloud platform label
-        df_posting["skills"] = df_posting["skills"].map(
-            lambda all_skills: all_skills | {cloud}
-            if (all_skills & cloud_skills)
-            else all_skills
-        )
-
-    clouds_set = set(cloud_skills_dict.keys())
-    # enrich the set of skills with high-level label 'Cloud'
+    # enrich the set of skills with high-level cloud platform labels and label 'Cloud'
     df_posting["skills"] = df_posting["skills"].map(
-        lambda all_skills: all_skills | {"Cloud"}
-        if all_skills & clouds_set
-        else all_skills
-    )
+        lambda skills: list(add_cloud_labels(skills, cloud_skills_dict))
+    )  # list for downloading in Big Query
 
-    df_posting["skills"] = df_posting["skills"].map(
-        list
-    )  # for downloading in Big Query
     df_skills = df_posting[["job_id", "skills"]].explode("skills").dropna()
     df_skills.rename(columns={"skills": "skill"}, inplace=True)
 
     #----------------------------------------------------update analytical tables-----------------------------------------
     
     #download data to the tmp table
-    bq = BQHelper(project=project,default_dataset=dataset)
     df_posting.rename(columns = {"job_id": "id"}, inplace=True)
-    df_posting = df_posting[JOBS_POSTINGS_FINAL_COLS]
+    df_posting = df_posting[jobs_final_cols]
     bq.df_to_table(df_posting, '_jp_jobs_batch', truncate=True, strict_schema=True)
     bq.df_to_table(df_skills, "_jp_jobs_skills_batch", truncate=True)
     bq.df_to_table(df_positions, "_jp_jobs_positions_batch", truncate=True)
@@ -232,8 +232,8 @@ def main(**kwargs):
         destination_table=f"{analytical_dataset}.jobs",
         source_table=f"{dataset}._jp_jobs_batch",  
         key_columns=["id"],
-        insert_columns=JOBS_POSTINGS_FINAL_COLS,
-        update_columns=JOBS_POSTINGS_FINAL_COLS,
+        insert_columns=jobs_final_cols,
+        update_columns=jobs_final_cols,
         raise_duplicates_error=True
     )
     
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from pipelines.rapidapi_jobs_posting.functions import get_post_id, get_post_ids
+
+LONG_TEXT = "Senior Data Engineer (m/w/d) – Python, SQL, GCP. " * 40
+
+ROWS = [
+    ("Data Engineer", "Acme GmbH", LONG_TEXT),
+    # strings shorter than the slice bounds, including the negative ones
+    ("BI", "", "x"),
+    # Kelvin sign is lowered to ASCII "k", accented letters are dropped
+    ("\u212aotlin Developer", "Café Müller", "Entwickler für Zürich " * 30),
+    ("ÀÉÎÕÜ ß ñ", "İstanbul Ltd.", "Straße"),
+    # missing values are treated as empty strings
+    (None, "Acme GmbH", "Description"),
+    (None, None, None),
+]
+
+
+@pytest.mark.parametrize("dtype", [object, "string[pyarrow]"])
+def test_get_post_ids_matches_get_post_id(dtype):
+    df = pd.DataFrame(ROWS, columns=["title", "company", "description"], dtype=dtype)
+    pd.testing.assert_series_equal(get_post_ids(df), df.apply(get_post_id, axis=1), check_dtype=False)
+
+
+@pytest.mark.parametrize("missing", [None, float("nan"), pd.NA])
+def test_get_post_ids_missing_value_is_empty_string(missing):
+    df = pd.DataFrame({"title": ["Data Engineer", missing], "company": ["Acme", "Acme"]}, dtype=object)
+    expected = pd.DataFrame({"title": ["Data Engineer", ""], "company": ["Acme", "Acme"]})
+    pd.testing.assert_series_equal(get_post_ids(df), df.apply(get_post_id, axis=1), check_dtype=False)
+    pd.testing.assert_series_equal(get_post_ids(df), get_post_ids(expected))
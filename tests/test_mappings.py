@@ -0,0 +1,76 @@
+import pytest
+
+from pipelines.rapidapi_jobs_posting.mappings import MISSING, _MappingDict, prepare_text
+
+RULES = {
+    "Python": "Python",
+    "Data Engineer": "Data Engineer",
+    "Senior Data Engineer": "Senior",
+    "Google Cloud Platform": "Google Cloud Platform",
+    "GCP": "Google Cloud Platform",
+    "SQL": "SQL",
+    "No SQL": "NoSQL",
+    "C++": "C++",
+    "Power BI": "Power BI",
+    "BI": "BI",
+}
+
+TEXTS = [
+    "Python",
+    "Senior Data Engineer",
+    "Senior Data Engineer (Python, SQL) - Google Cloud Platform",
+    "data engineer with python and no sql",
+    "PythonDeveloper, MySQL, NoSQL",
+    "Power BI / BI Developer",
+    "GCP",
+    "C++ developer",
+    "Engineer Data",
+    "Data  Engineer",
+    "",
+]
+
+
+def _mapping_dict(case_sensitive, spaces_sensitive):
+    return _MappingDict(dict(RULES), case_sensitive, spaces_sensitive).prepare()
+
+
+def _find_all_by_scan(mapping_dict, text):
+    return {val for key, val in mapping_dict.rules.items() if key in text}
+
+
+def _find_first_by_scan(mapping_dict, text):
+    return next((val for key, val in mapping_dict.rules.items() if key in text), MISSING)
+
+
+@pytest.mark.parametrize("case_sensitive", [False, True])
+@pytest.mark.parametrize("spaces_sensitive", [False, True])
+@pytest.mark.parametrize("text", TEXTS)
+def test_find_matches_substring_scan(case_sensitive, spaces_sensitive, text):
+    mapping_dict = _mapping_dict(case_sensitive, spaces_sensitive)
+    prepared_text = prepare_text(text, case_sensitive, spaces_sensitive)
+    assert mapping_dict.find_all(prepared_text) == _find_all_by_scan(mapping_dict, prepared_text)
+    assert mapping_dict.find_first(prepared_text) == _find_first_by_scan(mapping_dict, prepared_text)
+
+
+@pytest.mark.parametrize("case_sensitive", [False, True])
+def test_spaces_sensitive_keywords_match_at_text_edges(case_sensitive):
+    mapping_dict = _mapping_dict(case_sensitive, spaces_sensitive=True)
+    text = prepare_text("Data Engineer and Power BI", case_sensitive, spaces_sensitive=True)
+    assert mapping_dict.find_all(text) == {"Data Engineer", "Power BI", "BI"}
+
+
+def test_find_first_follows_rules_order():
+    mapping_dict = _mapping_dict(case_sensitive=False, spaces_sensitive=True)
+    # "Data Engineer" comes before "Senior Data Engineer" in rules, though it is found later in the text
+    text = prepare_text("SQL, Senior Data Engineer", case_sensitive=False, spaces_sensitive=True)
+    assert mapping_dict.find_first(text) == "Data Engineer"
+    assert mapping_dict.find_first(prepare_text("Java", False, True)) is MISSING
+
+
+def test_spaces_sensitive_keywords_match_whole_words_only():
+    mapping_dict = _mapping_dict(case_sensitive=True, spaces_sensitive=True)
+    text = prepare_text("PythonDeveloper, MySQL", case_sensitive=True, spaces_sensitive=True)
+    assert mapping_dict.find_all(text) == set()
+    assert _mapping_dict(case_sensitive=True, spaces_sensitive=False).find_all(
+        prepare_text("PythonDeveloper, MySQL", case_sensitive=True, spaces_sensitive=False)
+    ) == {"Python", "SQL"}
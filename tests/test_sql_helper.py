@@ -0,0 +1,126 @@
+import pytest
+
+from common.base.sql_helper import SQLhelper
+from common.bq_helper import BQHelper
+
+
+def test_merge_query_with_update_and_insert():
+    # the same statement as the f-string version generated before the templates
+    assert SQLhelper.generate_merge_query(
+        "p.d.jobs", "p.d.jobs_new", "id", ["id", "title", "city"], ["title", "city"]
+    ) == (
+        "MERGE p.d.jobs t"
+        "\nUSING p.d.jobs_new s"
+        "\n    ON t.id = s.id"
+        "\nWHEN MATCHED THEN"
+        "\n    UPDATE SET"
+        "\n        t.title = s.title,"
+        "\n        t.city = s.city"
+        "\nWHEN NOT MATCHED THEN"
+        "\n    INSERT("
+        "\n        id,"
+        "\n        title,"
+        "\n        city"
+        "\n    )"
+        "\n   VALUES("
+        "\n        s.id,"
+        "\n        s.title,"
+        "\n        s.city"
+        "\n    )"
+    )
+
+
+def test_merge_query_update_only_skips_key_columns():
+    assert SQLhelper.generate_merge_query(
+        "p.d.jobs", "p.d.jobs_new", ("id", "date"), update_columns=["id", "date", "title"]
+    ) == (
+        "MERGE p.d.jobs t"
+        "\nUSING p.d.jobs_new s"
+        "\n    ON t.id = s.id"
+        "\n    AND t.date = s.date"
+        "\nWHEN MATCHED THEN"
+        "\n    UPDATE SET"
+        "\n        t.title = s.title"
+    )
+
+
+def test_insert_only_query_when_update_columns_are_keys():
+    assert SQLhelper.generate_merge_query(
+        "p.d.jobs", "p.d.jobs_new", "id", ["id", "title"], ["id"]
+    ) == (
+        "INSERT INTO p.d.jobs ("
+        "\n    id,"
+        "\n    title"
+        "\n)"
+        "\nSELECT"
+        "\n    s.id,"
+        "\n    s.title"
+        "\nFROM p.d.jobs_new s"
+        "\nWHERE NOT EXISTS ("
+        "\n    SELECT 1"
+        "\n    FROM p.d.jobs t"
+        "\n    WHERE t.id = s.id"
+        "\n)"
+    )
+
+
+def test_merge_query_without_columns_raises():
+    with pytest.raises(ValueError):
+        SQLhelper.generate_merge_query("p.d.jobs", "p.d.jobs_new", "id", update_columns="id")
+
+
+def test_merge_query_with_key_range():
+    assert BQHelper._key_range_conditions(("id", "date")) == (
+        "t.id BETWEEN @id_min AND @id_max",
+        "t.date BETWEEN @date_min AND @date_max",
+    )
+    assert SQLhelper.generate_merge_query(
+        "p.d.jobs",
+        "p.d.jobs_new",
+        "id",
+        update_columns="title",
+        extra_match_conditions=BQHelper._key_range_conditions(("id",)),
+    ) == (
+        "MERGE p.d.jobs t"
+        "\nUSING p.d.jobs_new s"
+        "\n    ON t.id = s.id"
+        "\n    AND t.id BETWEEN @id_min AND @id_max"
+        "\nWHEN MATCHED THEN"
+        "\n    UPDATE SET"
+        "\n        t.title = s.title"
+    )
+
+
+def test_insert_only_query_with_deduplicated_source():
+    source_clause = BQHelper._deduplicated_source("p.d.jobs_new", ("id", "date"), "loaded_at DESC")
+    assert source_clause == (
+        "("
+        "\n    SELECT *"
+        "\n    FROM p.d.jobs_new"
+        "\n    WHERE TRUE"
+        "\n    QUALIFY ROW_NUMBER() OVER (PARTITION BY id, date ORDER BY loaded_at DESC) = 1"
+        "\n)"
+    )
+    assert SQLhelper.generate_merge_query(
+        "p.d.jobs", "p.d.jobs_new", ("id", "date"), ("id", "date"), source_clause=source_clause
+    ) == (
+        "INSERT INTO p.d.jobs ("
+        "\n    id,"
+        "\n    date"
+        "\n)"
+        "\nSELECT"
+        "\n    s.id,"
+        "\n    s.date"
+        "\nFROM ("
+        "\n    SELECT *"
+        "\n    FROM p.d.jobs_new"
+        "\n    WHERE TRUE"
+        "\n    QUALIFY ROW_NUMBER() OVER (PARTITION BY id, date ORDER BY loaded_at DESC) = 1"
+        "\n) s"
+        "\nWHERE NOT EXISTS ("
+        "\n    SELECT 1"
+        "\n    FROM p.d.jobs t"
+        "\n    WHERE t.id = s.id"
+        "\n    AND t.date = s.date"
+        "\n)"
+    )
@@ -0,0 +1,161 @@
+from io import BytesIO
+import threading
+import time
+
+import orjson
+import pandas as pd
+import pytest
+
+from common import utils
+from common.utils import _csv_to_df
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        # "None" and other pandas NA strings are nulls, not keywords
+        b"keyword,result\nNone,a\n,b\nnan,<NA>\nNULL,N/A\nPython,Python\n",
+        # dates and timestamps stay strings
+        b"date_created,checked_at\n2024-01-02,2024-01-02 10:00\n2024-02-03,2024-02-03 11:30\n",
+        # True/False are booleans, 1/0 are integers
+        b"case_sensitive,spaces_sensitive,n\nTrue,FALSE,1\nfalse,true,0\n",
+        # numbers with gaps are floats, a column without values is float NaN
+        b"keyword,n,empty\nx,1,\ny,,\nz,2.5,\n",
+    ],
+)
+def test_csv_to_df_matches_pandas_read_csv(content):
+    pd.testing.assert_frame_equal(_csv_to_df(content), pd.read_csv(BytesIO(content)))
+
+
+def test_csv_to_df_none_cell_is_null():
+    df = _csv_to_df(b"keyword,result\nNone,Python\n")
+    assert df["keyword"].isna().all()
+
+
+class _FakeResponse:
+    def __init__(self, content=b"", status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class _FakeGet:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, url, headers=None, **kwargs):
+        self.calls.append(headers or {})
+        return self.responses.pop(0)
+
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/sheet_id/edit?gid=0"
+SHEET_CSV = b"keyword,result\nPython,Python\n"
+
+
+def test_google_sheet_to_df_caches_response_without_etag(monkeypatch, tmp_path):
+    fake_get = _FakeGet(_FakeResponse(SHEET_CSV), _FakeResponse(SHEET_CSV))
+    monkeypatch.setattr(utils.http_client, "get", fake_get)
+
+    df = utils.google_sheet_to_df(SHEET_URL, cache_dir=str(tmp_path), cache_ttl=0)
+
+    pd.testing.assert_frame_equal(df, pd.read_csv(BytesIO(SHEET_CSV)))
+    assert len(list(tmp_path.glob("*.csv"))) == 1
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    # the TTL has passed and there is no ETag to revalidate: the sheet is downloaded again, unconditionally
+    utils.google_sheet_to_df(SHEET_URL, cache_dir=str(tmp_path), cache_ttl=0)
+    assert fake_get.calls == [{}, {}]
+
+
+def test_google_sheet_to_df_ttl_hit_does_not_request(monkeypatch, tmp_path):
+    fake_get = _FakeGet(_FakeResponse(SHEET_CSV))
+    monkeypatch.setattr(utils.http_client, "get", fake_get)
+
+    first = utils.google_sheet_to_df(SHEET_URL, cache_dir=str(tmp_path), cache_ttl=3600)
+    second = utils.google_sheet_to_df(SHEET_URL, cache_dir=str(tmp_path), cache_ttl=3600)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert len(fake_get.calls) == 1
+
+
+def test_google_sheet_to_df_not_modified_reads_cache(monkeypatch, tmp_path):
+    fake_get = _FakeGet(
+        _FakeResponse(SHEET_CSV, headers={"ETag": '"v1"'}),
+        _FakeResponse(status_code=304),
+    )
+    monkeypatch.setattr(utils.http_client, "get", fake_get)
+
+    first = utils.google_sheet_to_df(SHEET_URL, cache_dir=str(tmp_path), cache_ttl=0)
+    second = utils.google_sheet_to_df(SHEET_URL, cache_dir=str(tmp_path), cache_ttl=0)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert fake_get.calls == [{}, {"If-None-Match": '"v1"'}]
+
+
+def _fake_pages_get(pages_count, requested_pages):
+    def fake_get(url, headers=None, params=None, **kwargs):
+        page = params["page"]
+        requested_pages.append(page)
+        # earlier pages are answered later, so responses arrive out of order
+        time.sleep(0.01 * (page % 3))
+        return _FakeResponse(orjson.dumps({"result": [{"page": page}] if page <= pages_count else []}))
+    return fake_get
+
+
+def _get_pages(**kwargs):
+    source = utils.paginated_source(url="https://api.example.com/jobs", response_format="json", delay=0, **kwargs)
+    return [row["page"] for row in source.resources["get_pages"]]
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+@pytest.mark.parametrize("end_page", [None, 9])
+def test_paginated_source_yields_pages_in_order_until_empty(monkeypatch, max_workers, end_page):
+    requested_pages = []
+    monkeypatch.setattr(utils.http_client, "get", _fake_pages_get(5, requested_pages))
+    uploaded_paths = []
+    monkeypatch.setattr(utils, "bytes_to_gcs", lambda content, gcs_bucket, path: uploaded_paths.append(path))
+
+    pages = _get_pages(
+        end_page=end_page,
+        allow_no_end_page=end_page is None,
+        max_workers=max_workers,
+        upload_to_gcs=True,
+        storage_path="raw/",
+        file_name="jobs",
+        gcs_bucket="bucket",
+    )
+
+    assert pages == [1, 2, 3, 4, 5]
+    # the first empty page is 6, up to max_workers - 1 pages after it may be requested
+    assert sorted(requested_pages)[:6] == [1, 2, 3, 4, 5, 6]
+    assert max(requested_pages) <= 6 + max_workers - 1
+    assert sorted(uploaded_paths) == sorted(f"raw/jobs_{page}.json" for page in pages)
+
+
+def test_paginated_source_stops_at_end_page(monkeypatch):
+    requested_pages = []
+    monkeypatch.setattr(utils.http_client, "get", _fake_pages_get(10, requested_pages))
+
+    assert _get_pages(start_page=2, end_page=4, max_workers=4) == [2, 3, 4]
+    assert sorted(requested_pages) == [2, 3, 4]
+
+
+def test_rate_limiter_spaces_calls_from_threads():
+    delay = 0.05
+    rate_limiter = utils.RateLimiter(delay)
+    passed_at = []
+    lock = threading.Lock()
+
+    def call():
+        rate_limiter.wait()
+        with lock:
+            passed_at.append(time.monotonic())
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    passed_at.sort()
+    assert all(later - earlier >= delay * 0.9 for earlier, later in zip(passed_at, passed_at[1:]))